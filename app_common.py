@@ -0,0 +1,218 @@
+"""Helpers shared by the Streamlit entry points.
+
+Host checks, model listing and buffered stream rendering live here so every
+app gets the same lazily built HTTP client and the same ``st.cache_data`` entries.
+"""
+import functools
+import queue
+import threading
+import time
+from typing import List, Tuple
+
+import streamlit as st
+
+# Streamed text is flushed to the page once this many characters are pending
+# or this many seconds have passed, instead of re-rendering on every token.
+STREAM_FLUSH_CHARS = 8192
+STREAM_FLUSH_SECONDS = 0.025
+
+# Marks the end of a stream read by _pump_stream
+_STREAM_END = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _http():
+    """Return the pooled HTTP/2-capable client shared by all HTTP probes.
+
+    Streamlit reruns reuse its open connections (multiplexed over one where the
+    server allows it) instead of paying a fresh TCP handshake on every call.
+    httpx is imported and the client built on first use, so apps that only need
+    the stream writer don't pay for the HTTP stack at startup.
+    """
+    import httpx
+    return httpx.Client(
+        timeout=3.0,
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        ),
+    )
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def check_host(host: str, timeout: float = 1.0) -> Tuple[bool, str]:
+    """Try a simple HTTP HEAD to the provided host. Returns (ok, message).
+
+    We do a plain HEAD to the host root to detect connection/refused and surface
+    helpful troubleshooting info without downloading a body. This is
+    intentionally conservative (no assumptions about specific Ollama endpoints).
+    """
+    import httpx
+    try:
+        resp = _http().head(host, timeout=timeout)
+        return True, f"Reachable: HTTP {resp.status_code}"
+    except httpx.ConnectError:
+        return False, "Connection refused — is Ollama running? Try `ollama serve`"
+    except (httpx.InvalidURL, httpx.UnsupportedProtocol):
+        return False, "Invalid host URL. Make sure it starts with http:// or https://"
+    except httpx.TimeoutException:
+        return False, "Connection timed out — check network and host/port"
+    except Exception as e:
+        return False, f"Error: {e}"
+
+
+# Older name kept for existing callers
+check_ollima_host = check_host
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def list_models(host: str, timeout: float = 3.0) -> List[str]:
+    """Return a list of available model ids from the Ollama HTTP API (/v1/models).
+
+    Returns an empty list on error. Results are cached per (host, timeout) for
+    30 seconds; call ``list_models.clear()`` to force a fresh listing.
+    """
+    try:
+        resp = _http().get(f"{host.rstrip('/')}/v1/models", timeout=timeout)
+        data = resp.json()
+        return [m.get('id') for m in data.get('data', []) if 'id' in m]
+    except Exception:
+        return []
+
+
+def _as_text(content) -> str:
+    """Coerce a delta ``content`` value to text.
+
+    Content is normally a string, but may be a list of text parts (strings,
+    ``{"text": ...}`` dicts or objects with ``.text``). Anything else is "".
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        texts = []
+        for part in content:
+            if isinstance(part, str):
+                texts.append(part)
+            elif isinstance(part, dict):
+                texts.append(part.get("text") or "")
+            else:
+                texts.append(getattr(part, "text", None) or "")
+        return "".join(t for t in texts if isinstance(t, str))
+    return ""
+
+
+def _stream_error(error) -> RuntimeError:
+    """Build the exception raised for an ``error`` carried inside a chunk."""
+    if isinstance(error, dict):
+        message = error.get("message") or error
+    else:
+        message = getattr(error, "message", None) or error
+    return RuntimeError(f"Stream error: {message}")
+
+
+def _delta_extractor(first):
+    """Return a function reading the delta text from stream chunks.
+
+    The chunk format (dict or object) is detected from ``first`` so the
+    per-token path does no type checks; callers pick a new extractor when the
+    chunk type changes. Chunks without choices or with malformed fields yield
+    "". A chunk carrying an ``error`` (how OpenRouter reports a mid-stream
+    failure) raises ``RuntimeError``.
+    """
+    if isinstance(first, dict):
+        def extract(chunk):
+            error = chunk.get("error")
+            if error:
+                raise _stream_error(error)
+            try:
+                choices = chunk.get("choices")
+                return _as_text(choices[0]["delta"].get("content")) if choices else ""
+            except (KeyError, AttributeError, IndexError, TypeError):
+                return ""
+    else:
+        def extract(chunk):
+            error = getattr(chunk, "error", None)
+            if error:
+                raise _stream_error(error)
+            try:
+                choices = chunk.choices
+                return _as_text(choices[0].delta.content) if choices else ""
+            except (KeyError, AttributeError, IndexError, TypeError):
+                return ""
+    return extract
+
+
+def _pump_stream(stream, pieces: "queue.Queue", stop: threading.Event) -> None:
+    """Read a streamed chat completion on a worker thread.
+
+    Each text delta is put on ``pieces``; an exception raised by the stream is
+    put on the queue as-is, and ``_STREAM_END`` always comes last. Reading stops
+    as soon as ``stop`` is set, and the stream is closed when it supports it.
+    No Streamlit calls are made here, so the script thread stays the only one
+    rendering.
+    """
+    try:
+        extract = None
+        chunk_type = None
+        for chunk in stream:
+            if stop.is_set():
+                break
+            # openrouter_client yields raw dicts for chunks it fails to
+            # validate, so one stream can mix dicts and model objects
+            if type(chunk) is not chunk_type:
+                chunk_type = type(chunk)
+                extract = _delta_extractor(chunk)
+            pieces.put(extract(chunk))
+    except Exception as e:
+        pieces.put(e)
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+        pieces.put(_STREAM_END)
+
+
+def buffered_stream_writer(placeholder, stream) -> str:
+    """Render a streamed chat completion into ``placeholder`` and return its text.
+
+    The stream is read on a worker thread while this (script) thread renders,
+    re-drawing only after ``STREAM_FLUSH_CHARS`` pending characters or
+    ``STREAM_FLUSH_SECONDS`` since the last flush. Errors raised by the stream
+    are re-raised here after the text received so far has been rendered. If
+    this thread is interrupted (a rerun or Stop), the worker is told to stop
+    reading so the connection is not kept open to the end of the completion.
+    """
+    pieces = queue.Queue()
+    stop = threading.Event()
+    threading.Thread(target=_pump_stream, args=(stream, pieces, stop), daemon=True).start()
+    parts = []
+    pending = 0
+    last_flush = time.monotonic()
+    try:
+        while True:
+            try:
+                item = pieces.get(timeout=STREAM_FLUSH_SECONDS)
+            except queue.Empty:
+                item = ""
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                placeholder.markdown("".join(parts))
+                raise item
+            if item:
+                parts.append(item)
+                pending += len(item)
+            now = time.monotonic()
+            if pending and (pending >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_SECONDS):
+                placeholder.markdown("".join(parts))
+                pending = 0
+                last_flush = now
+    finally:
+        stop.set()
+    text = "".join(parts)
+    placeholder.markdown(text)
+    return text
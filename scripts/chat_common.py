@@ -0,0 +1,52 @@
+"""Helpers shared by the chat test scripts in this directory."""
+import operator
+
+import httpx
+
+
+def make_http_client():
+    return httpx.Client(
+        timeout=5.0,
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        ),
+    )
+
+
+def _dict_content(chunk):
+    return chunk['message']['content']
+
+
+_attr_content = operator.attrgetter('message.content')
+
+
+def chat_accumulated(client, model, messages) -> str:
+    """Stream a chat and return the full reply text.
+
+    Ollama can be dramatically slower when stream=False, so the chunks are
+    streamed and joined here even though callers only want the final string.
+    Raises RuntimeError when no text could be read from the stream, quoting
+    the last chunk received (if any) for diagnosis.
+    """
+    parts = []
+    extract = None
+    last = None
+    for chunk in client.chat(model=model, messages=messages, stream=True):
+        last = chunk
+        # chunk may have .message.content or dict form; decide once
+        if extract is None:
+            extract = _dict_content if isinstance(chunk, dict) else _attr_content
+        try:
+            content = extract(chunk)
+        except (KeyError, AttributeError, TypeError):
+            continue
+        if isinstance(content, str):
+            parts.append(content)
+    text = ''.join(parts)
+    if not text:
+        if last is None:
+            raise RuntimeError('no chunks received from the chat stream')
+        raise RuntimeError(f'no message content in chat stream; last chunk: {last!r}')
+    return text
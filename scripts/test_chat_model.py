@@ -1,5 +1,9 @@
 import sys
-import requests
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 try:
     from ollama import Client
@@ -7,39 +11,42 @@ except Exception as e:
     print('ERROR_IMPORT:', e)
     sys.exit(2)
 
-model = sys.argv[1] if len(sys.argv) > 1 else 'gemma3:4b'
+from chat_common import chat_accumulated, make_http_client
+
 HOST = 'http://localhost:11434'
 
-print('TRY_MODEL:', model)
 
-# list models
-try:
-    data = requests.get(HOST + '/v1/models', timeout=5).json()
-    models = [m.get('id') for m in data.get('data', []) if 'id' in m]
-    print('AVAILABLE_MODELS:', models)
-except Exception as e:
-    print('ERROR_LIST_MODELS:', e)
-    models = []
+def main():
+    model = sys.argv[1] if len(sys.argv) > 1 else 'gemma3:4b'
+    http = make_http_client()
 
-try:
-    client = Client(host=HOST)
-except Exception as e:
-    print('ERROR_CREATE_CLIENT:', e)
-    sys.exit(3)
+    print('TRY_MODEL:', model)
 
-messages = [{'role': 'user', 'content': 'Hello, reply with one word.'}]
+    # list models
+    try:
+        data = _json.loads(http.get(HOST + '/v1/models').content)
+        models = [m.get('id') for m in data.get('data', []) if 'id' in m]
+        print('AVAILABLE_MODELS:', models)
+    except Exception as e:
+        print('ERROR_LIST_MODELS:', e)
+        models = []
 
-try:
-    resp = client.chat(model=model, messages=messages)
     try:
-        print('RESPONSE:', resp.message.content)
-    except Exception:
-        try:
-            print('RESPONSE:', resp['message']['content'])
-        except Exception:
-            print('RESPONSE_RAW:', resp)
-except Exception as e:
-    print('ERROR_CHAT_CALL:', e)
-    sys.exit(4)
+        client = Client(host=HOST)
+    except Exception as e:
+        print('ERROR_CREATE_CLIENT:', e)
+        sys.exit(3)
+
+    messages = [{'role': 'user', 'content': 'Hello, reply with one word.'}]
+
+    try:
+        print('RESPONSE:', chat_accumulated(client, model, messages))
+    except Exception as e:
+        print('ERROR_CHAT_CALL:', e)
+        sys.exit(4)
+
+    print('OK')
+
 
-print('OK')
+if __name__ == '__main__':
+    main()
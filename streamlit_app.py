@@ -1,14 +1,36 @@
-import os
+import textwrap
 import streamlit as st
-from typing import List, Dict, Tuple
-from openrouter_client import OpenRouterClient
-
-# Extra deps for connectivity check
-import requests
 from dotenv import load_dotenv
 
+from app_common import buffered_stream_writer
+
 load_dotenv()
 
+# Prompts sent with every plan request. The user template is filled in only
+# when the form is submitted.
+SYSTEM_PROMPT = "You are a professional Health and Fitness Coach. Provide detailed, safe, and personalized exercise recommendations."
+
+PROMPT_TMPL = textwrap.dedent("""
+    You are a professional Health and Fitness Coach. Based on the following information, create a personalized weekly exercise plan:
+
+    - Age: {age} years old
+    - Known health issues: {health_issues}
+    - Available daily exercise time: {time_minutes} minutes
+    - Fitness goal: {fitness_goal}
+
+    Please provide:
+    1. A detailed weekly exercise plan (7 days)
+    2. Specific exercises for each day
+    3. Duration and repetitions/sets
+    4. Any important considerations based on the health information provided
+    5. Tips for staying motivated and safe
+
+    Format the response in a clear, easy-to-follow structure.
+
+    Start the response with: 'This is UAB Sveikata health agent speaking.'
+    End the response with: 'This answer was generated by AI and is not a professional doctor opinion.'
+""").strip()
+
 # Updated UI and text for a fresh look
 st.set_page_config(
     page_title="AI-Powered Fitness Planner",
@@ -33,37 +55,17 @@ st.markdown(
 )
 
 
-def check_ollima_host(host: str, timeout: float = 3.0) -> Tuple[bool, str]:
-    """Try a simple HTTP GET to the provided host. Returns (ok, message).
-
-    We do a plain GET to the host root to detect connection/refused and surface
-    helpful troubleshooting info. This is intentionally conservative (no
-    assumptions about specific Ollama endpoints).
-    """
-    try:
-        resp = requests.get(host, timeout=timeout)
-        return True, f"Reachable: HTTP {resp.status_code}"
-    except requests.exceptions.ConnectionError:
-        return False, "Connection refused — is Ollima running? Try `ollima serve`"
-    except requests.exceptions.InvalidURL:
-        return False, "Invalid host URL. Make sure it starts with http:// or https://"
-    except requests.exceptions.Timeout:
-        return False, "Connection timed out — check network and host/port"
-    except Exception as e:
-        return False, f"Error: {e}"
-
-
-def list_models(host: str, timeout: float = 3.0):
-    """Return a list of available model ids from the Ollama HTTP API (/v1/models).
+@st.cache_resource(show_spinner=False, max_entries=16, ttl=3600)
+def get_openrouter_client(api_key: str):
+    """Return an OpenRouterClient shared by every session using this API key.
 
-    Returns an empty list on error.
+    The client is reused for up to an hour, so later submissions (from any
+    browser tab) reuse its warm HTTP connections. At most 16 keys are kept, so
+    typos and one-off keys don't pin clients for the life of the process.
+    Construction errors are not cached and propagate to the caller.
     """
-    try:
-        resp = requests.get(f"{host.rstrip('/')}/v1/models", timeout=timeout)
-        data = resp.json()
-        return [m.get('id') for m in data.get('data', []) if 'id' in m]
-    except Exception:
-        return []
+    from openrouter_client import OpenRouterClient
+    return OpenRouterClient(api_key=api_key)
 
 
 # Sidebar for configuration
@@ -169,81 +171,77 @@ if submitted:
         for error in errors:
             st.error(error)
     else:
+        health_text = health_issues.strip() or "None"
+        
         # Create the prompt
-        prompt = f"""You are a professional Health and Fitness Coach. Based on the following information, create a personalized weekly exercise plan:
-
-- Age: {age} years old
-- Known health issues: {health_issues if health_issues else "None"}
-- Available daily exercise time: {time_minutes} minutes
-- Fitness goal: {fitness_goal}
-
-Please provide:
-1. A detailed weekly exercise plan (7 days)
-2. Specific exercises for each day
-3. Duration and repetitions/sets
-4. Any important considerations based on the health information provided
-5. Tips for staying motivated and safe
-
-Format the response in a clear, easy-to-follow structure.
-
-Start the response with: 'This is UAB Sveikata health agent speaking.'
-End the response with: 'This answer was generated by AI and is not a professional doctor opinion.'"""
+        prompt = PROMPT_TMPL.format(
+            age=age,
+            health_issues=health_text,
+            time_minutes=time_minutes,
+            fitness_goal=fitness_goal,
+        )
 
         # Generate response
-        with st.spinner("🤔 Generating your personalized exercise plan..."):
-            try:
-                # Initialize OpenRouter client
-                client = OpenRouterClient(api_key=api_key)
-                
-                # Create chat completion
-                response = client.chat.create(
+        try:
+            # Shared OpenRouter client for this key (and its warm connections)
+            client = get_openrouter_client(api_key)
+            
+            # Stream the chat completion so the plan renders as tokens arrive
+            with st.spinner("🤔 Generating your personalized exercise plan..."):
+                stream = client.chat.create(
                     model=selected_model,
                     messages=[
                         {
                             "role": "system",
-                            "content": "You are a professional Health and Fitness Coach. Provide detailed, safe, and personalized exercise recommendations."
+                            "content": SYSTEM_PROMPT
                         },
                         {
                             "role": "user",
                             "content": prompt
                         }
-                    ]
+                    ],
+                    stream=True
                 )
-                
-                # Display the response
-                st.success("✅ Your personalized exercise plan is ready!")
-                st.markdown("---")
-                
-                # Display the plan in a nice container
-                st.markdown("### 📅 Your Weekly Exercise Plan")
-                st.markdown(response.choices[0].message.content)
-                st.markdown("---")
-                st.warning("⚠️ **Disclaimer:** This is AI-generated response and cannot be treated as professional doctor's advice.")
-                
-                # Option to download the plan
-                plan_text = f"""PERSONALIZED EXERCISE PLAN
+            
+            st.markdown("---")
+            
+            # Display the plan in a nice container
+            st.markdown("### 📅 Your Weekly Exercise Plan")
+            placeholder = st.empty()
+            # Shown until the first streamed text replaces it
+            placeholder.markdown("_🤔 Generating your personalized exercise plan..._")
+            response_text = buffered_stream_writer(placeholder, stream)
+            if not response_text.strip():
+                raise RuntimeError("The model returned an empty response")
+            
+            st.markdown("---")
+            st.success("✅ Your personalized exercise plan is ready!")
+            st.warning("⚠️ **Disclaimer:** This is AI-generated response and cannot be treated as professional doctor's advice.")
+            
+            # Option to download the plan
+            plan_text = f"""PERSONALIZED EXERCISE PLAN
 
 Age: {age} years
-Health Issues: {health_issues if health_issues else "None"}
+Health Issues: {health_text}
 Daily Exercise Time: {time_minutes} minutes
 Goal: {fitness_goal}
 
-{response.choices[0].message.content}
+{response_text}
 
 ---
 DISCLAIMER: This is AI-generated response and cannot be treated as professional doctor's advice.
 """
-                
-                st.download_button(
-                    label="📥 Download Exercise Plan",
-                    data=plan_text,
-                    file_name="exercise_plan.txt",
-                    mime="text/plain"
-                )
-                
-            except Exception as e:
-                st.error(f"❌ Error generating plan: {str(e)}")
-                st.info("💡 Please check your API key and try again. Make sure you have credits in your OpenRouter account.")
+            
+            st.download_button(
+                label="📥 Download Exercise Plan",
+                data=plan_text,
+                file_name="exercise_plan.txt",
+                mime="text/plain"
+            )
+            
+        except Exception as e:
+            st.error(f"❌ Error generating plan: {str(e)}")
+            st.info("💡 Please check your API key and try again. Make sure you have credits in your OpenRouter account.")
 
 # Footer
 st.markdown("---")